@@ -0,0 +1,202 @@
+"""
+Benchmark ukuran prompt dan waktu encoding untuk hasil query yang dikirim ke LLM.
+
+Membandingkan format lama (`json.dumps(..., indent=2)`) dengan format ringkas
+dari `utils.prompt_utils` pada beberapa hasil query yang representatif.
+Mode offline hanya memakai estimasi token (`estimate_tokens`, panjang/4) yang
+melebih-lebihkan biaya indentasi; angka token sebenarnya hanya tersedia di mode --live.
+
+Jalankan:
+    python bench_prompt_encoding.py          # estimasi token & waktu encoding (offline)
+    python bench_prompt_encoding.py --live   # ditambah token asli & latensi Gemini (butuh GOOGLE_API_KEY)
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from utils.prompt_utils import (
+    MAX_CELL_CHARS,
+    PROMPT_TOKEN_BUDGET,
+    _compact_rows,
+    encode_rows,
+    encode_table_schemas,
+    estimate_tokens,
+    to_compact_json,
+)
+
+ENCODE_REPEATS = 50
+# Jumlah panggilan Gemini per kasus untuk menghitung median latensi (setelah satu panggilan pemanasan)
+LIVE_REPEATS = 5
+LIVE_MODEL_NAME = "gemini-1.5-flash"
+
+BIDANG = ["Teknologi Informasi", "Kesehatan", "Pertanian", "Pendidikan", "Ekonomi", "Teknik Sipil"]
+SKEMA = ["Penelitian Dasar", "Penelitian Terapan", "Pengabdian Masyarakat"]
+ABSTRAK = (
+    "Penelitian ini bertujuan untuk menganalisis pengaruh penerapan teknologi digital terhadap "
+    "peningkatan kinerja dan efisiensi proses bisnis pada usaha mikro, kecil, dan menengah di wilayah "
+    "pedesaan dengan pendekatan metode campuran serta studi kasus pada beberapa kabupaten."
+)
+
+
+def _hasil_agregat() -> list[dict]:
+    """Hasil analitik kecil: jumlah publikasi per tahun dan bidang."""
+    return [
+        {"tahun": tahun, "bidang": bidang, "jumlah_publikasi": random.randint(5, 200),
+         "total_dana": Decimal(random.randint(50, 900) * 1_000_000)}
+        for tahun in range(2019, 2025) for bidang in BIDANG
+    ]
+
+
+def _daftar_penelitian(jumlah: int) -> list[dict]:
+    """Hasil metadata: daftar penelitian beserta judul, abstrak, tanggal, dan URL PDF."""
+    rows = []
+    for i in range(jumlah):
+        rows.append({
+            "id_penelitian": 1000 + i,
+            "judul": f"Analisis {random.choice(BIDANG)} Berbasis Data untuk Pembangunan Daerah Tahap {i}",
+            "nama_ketua": f"Dr. Peneliti {i % 37}, M.Kom.",
+            "bidang": random.choice(BIDANG),
+            "skema": random.choice(SKEMA),
+            "tahun": random.randint(2018, 2024),
+            "dana": random.uniform(10_000_000, 250_000_000),
+            "tanggal_mulai": datetime(2018 + i % 7, 1 + i % 12, 1),
+            "tanggal_selesai": date(2019 + i % 7, 1 + i % 12, 28),
+            "abstrak": ABSTRAK,
+            "laporan_akhir": f"https://storage.googleapis.com/upload_data_file/laporan/{1000 + i}.pdf",
+        })
+    return rows
+
+
+def _skema_tabel() -> dict:
+    """Skema tabel seperti yang dihasilkan `get_table_schemas`."""
+    kolom = list(_daftar_penelitian(1)[0])
+    return {
+        "penelitian": [{"name": k, "type": "STRING"} for k in kolom],
+        "author": [{"name": k, "type": t} for k, t in
+                   [("id_author", "INT64"), ("nama", "STRING"), ("fakultas", "STRING"), ("email", "STRING")]],
+        "publikasi": [{"name": k, "type": t} for k, t in
+                      [("id_publikasi", "INT64"), ("id_penelitian", "INT64"), ("jurnal", "STRING"),
+                       ("tahun", "INT64"), ("PDF_makalah", "STRING")]],
+    }
+
+
+def _time_ms(func, data):
+    """Menjalankan encoder beberapa kali dan mengembalikan hasil serta rata-rata waktu (ms)."""
+    start = time.perf_counter()
+    for _ in range(ENCODE_REPEATS):
+        text = func(data)
+    return text, (time.perf_counter() - start) * 1000 / ENCODE_REPEATS
+
+
+def _count_tokens(model, text: str) -> int:
+    """Menghitung token sebenarnya dengan tokenizer Gemini."""
+    return model.count_tokens(text).total_tokens
+
+
+def _live_latency(question: str, context, repeats: int = LIVE_REPEATS) -> tuple[float | None, int]:
+    """
+    Mengukur median latensi panggilan `answer_from_documents` (detik).
+    `call_gemini_api` mengembalikan "Error: ..." alih-alih melempar exception, sehingga
+    respons tersebut tidak dihitung. Mengembalikan (median, jumlah panggilan gagal).
+    """
+    from llm import answer_from_documents  # impor di sini agar mode offline tidak butuh API key
+
+    durations = []
+    failures = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        answer = answer_from_documents(question, context)
+        elapsed = time.perf_counter() - start
+        if answer.startswith("Error:"):
+            failures += 1
+        else:
+            durations.append(elapsed)
+    return (statistics.median(durations) if durations else None), failures
+
+
+def _format_latency(median: float | None, failures: int) -> str:
+    """Memformat median latensi beserta jumlah panggilan yang gagal."""
+    text = f"{median:.2f}s" if median is not None else "gagal"
+    return f"{text} ({failures} gagal)" if failures else text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Hitung token asli dan ukur latensi panggilan Gemini.")
+    parser.add_argument("--repeats", type=int, default=LIVE_REPEATS, help="Jumlah panggilan per kasus di mode --live.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    cases = [
+        ("agregat (36 baris)", _hasil_agregat()),
+        ("daftar (20 baris)", _daftar_penelitian(20)),
+        ("daftar (500 baris)", _daftar_penelitian(500)),
+        ("skema tabel", _skema_tabel()),
+    ]
+
+    def verbose(data):
+        return json.dumps(data, indent=2, default=str)
+
+    def compact(data):
+        if isinstance(data, dict):
+            return encode_table_schemas(data), None, None
+        return _compact_rows(data, PROMPT_TOKEN_BUDGET, MAX_CELL_CHARS)
+
+    print("Estimasi token (panjang/4), bukan token asli.")
+    print("  tabel  = encode_rows tanpa pemotongan (hemat format saja, lossless)")
+    print("  baru   = hasil akhir setelah pemotongan sel dan/atau sampling")
+    print("  dimuat = baris yang ditampilkan / total baris, batas panjang sel")
+    print(f"{'kasus':<20} {'est lama':>9} {'est json':>9} {'est tabel':>10} {'est baru':>9} "
+          f"{'hemat fmt':>10} {'hemat tot':>10} {'dimuat':>14} {'ms lama':>8} {'ms baru':>8}")
+    encoded = []
+    for name, data in cases:
+        old_text, old_ms = _time_ms(verbose, data)
+        (new_text, kept_rows, cell_chars), new_ms = _time_ms(compact, data)
+        lossless = encode_table_schemas(data) if isinstance(data, dict) else encode_rows(data, sys.maxsize)
+        encoded.append((name, data, old_text, lossless, new_text))
+        old_tokens = estimate_tokens(old_text)
+        json_tokens = estimate_tokens(to_compact_json(data))
+        table_tokens = estimate_tokens(lossless)
+        new_tokens = estimate_tokens(new_text)
+        format_saving = 100 * (1 - table_tokens / old_tokens)
+        total_saving = 100 * (1 - new_tokens / old_tokens)
+        kept = f"{kept_rows}/{len(data)}, {cell_chars}" if kept_rows is not None else "-"
+        print(f"{name:<20} {old_tokens:>9} {json_tokens:>9} {table_tokens:>10} {new_tokens:>9} "
+              f"{format_saving:>9.1f}% {total_saving:>9.1f}% {kept:>14} {old_ms:>8.2f} {new_ms:>8.2f}")
+
+    if not args.live:
+        return
+
+    import google.generativeai as genai
+    import llm  # noqa: F401 -- mengonfigurasi API key Gemini
+
+    model = genai.GenerativeModel(LIVE_MODEL_NAME)
+    print(f"\nToken asli ({LIVE_MODEL_NAME}) dibanding estimasi:")
+    print(f"{'kasus':<20} {'est lama':>9} {'asli lama':>10} {'asli tabel':>11} {'est baru':>9} {'asli baru':>10} "
+          f"{'hemat fmt':>10} {'hemat tot':>10}")
+    for name, _, old_text, lossless, new_text in encoded:
+        old_real = _count_tokens(model, old_text)
+        table_real = _count_tokens(model, lossless)
+        new_real = _count_tokens(model, new_text)
+        format_saving = 100 * (1 - table_real / old_real)
+        total_saving = 100 * (1 - new_real / old_real)
+        print(f"{name:<20} {estimate_tokens(old_text):>9} {old_real:>10} {table_real:>11} "
+              f"{estimate_tokens(new_text):>9} {new_real:>10} {format_saving:>9.1f}% {total_saving:>9.1f}%")
+
+    question = "Bandingkan jumlah publikasi per bidang dan jelaskan trennya."
+    print(f"\nMedian latensi answer_from_documents ({args.repeats} panggilan per format):")
+    _live_latency(question, encoded[0][1], repeats=1)  # pemanasan, tidak dihitung
+    for name, data, old_text, _, _ in encoded[:3]:
+        old_latency = _format_latency(*_live_latency(question, old_text, args.repeats))
+        new_latency = _format_latency(*_live_latency(question, data, args.repeats))
+        print(f"{name:<20} lama={old_latency} baru={new_latency}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,4 +11,7 @@ BIGQUERY_PROJECT_ID = "swift-kiln-461800-u0"
 BIGQUERY_DATASET_ID = "proposal_penelitian"
 
 # Pastikan path ini benar atau gunakan metode autentikasi lain
-SERVICE_ACCOUNT_KEY_PATH = os.getenv("SERVICE_ACCOUNT_KEY_PATH")
\ No newline at end of file
+SERVICE_ACCOUNT_KEY_PATH = os.getenv("SERVICE_ACCOUNT_KEY_PATH")
+
+# Anggaran token untuk hasil query yang dimasukkan ke prompt LLM
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "4000"))
\ No newline at end of file
@@ -4,7 +4,8 @@ import google.generativeai as genai
 import json
 import re
 import logging
-from config import GOOGLE_API_KEY
+from config import GOOGLE_API_KEY, PROMPT_TOKEN_BUDGET
+from utils.prompt_utils import compact_rows_for_prompt, encode_table_schemas, to_compact_json
 
 # Konfigurasi API Google
 genai.configure(api_key=GOOGLE_API_KEY)
@@ -58,7 +59,7 @@ logger = logging.getLogger(__name__)
 
 def generate_json_map_from_schema_and_query(user_query: str, table_schemas: dict) -> dict:
     """Membuat JSON map untuk query SQL."""
-    schemas_str = json.dumps(table_schemas, indent=2)
+    schemas_str = encode_table_schemas(table_schemas)
     system_prompt = (
         "Anda adalah AI yang menerjemahkan permintaan pengguna menjadi JSON terstruktur untuk query SQL.\n\n"
         "Format JSON yang Diharapkan:\n"
@@ -78,7 +79,7 @@ def generate_json_map_from_schema_and_query(user_query: str, table_schemas: dict
         "- Perhatikan tipe data dari skema. Jika kolom bertipe `INT64`, `NUMERIC`, atau `FLOAT64`, nilai filter HARUS berupa angka, bukan string (contoh: `\"nilai\": 2022`, bukan `\"nilai\": \"2022\"`).\n"
         "- Jika query menanyakan isi dokumen (misal 'jelaskan makalah...'), pastikan `kolom` yang dipilih adalah kolom yang berisi URL PDF (misal `PDF_makalah`, `PDF_buku`).\n"
         "- Selalu lakukan JOIN jika filter atau kolom yang dipilih membutuhkan data dari tabel lain (misal, filter nama author dari tabel `author`).\n\n"
-        f"Tabel Tersedia:\n{schemas_str}"
+        f"Tabel Tersedia (format `tabel(kolom:TIPE,...)`):\n{schemas_str}"
     )
     
     messages = [
@@ -94,7 +95,7 @@ def generate_json_map_from_schema_and_query(user_query: str, table_schemas: dict
 
 def generate_sql_from_json_map(json_map: dict, project_id: str, dataset_id: str) -> str:
     """Mengubah JSON map menjadi query SQL BigQuery."""
-    json_map_str = json.dumps(json_map, indent=2)
+    json_map_str = to_compact_json(json_map)
     system_prompt = f"""Anda adalah AI ahli SQL untuk BigQuery. Ubah JSON map berikut menjadi query SQL yang valid.
     Aturan:
     1. Gunakan format nama tabel lengkap: `{project_id}.{dataset_id}.nama_tabel`.
@@ -296,11 +297,15 @@ def classify_user_intent(user_query: str) -> dict:
 #     return cleaned_sql
 
 # --- Fungsi Jawaban dari Dokumen (RAG - DIPERBAIKI) ---
-def answer_from_documents(question: str, context_chunks: str) -> str:
+def answer_from_documents(question: str, context_chunks: str | list[dict]) -> str:
     """
     Menjawab pertanyaan analisis berdasarkan konteks dokumen (RAG).
     Prompt ditingkatkan untuk kemampuan analisis, sintesis, dan peringkasan.
+    Jika konteks berupa baris hasil query, baris tersebut dikodekan ke tabel ringkas terlebih dahulu.
     """
+    if isinstance(context_chunks, list):
+        context_chunks = compact_rows_for_prompt(context_chunks, token_budget=PROMPT_TOKEN_BUDGET)
+
     system_prompt = (
         "Analisis & jawab pertanyaan berdasarkan 'Konteks Dokumen'. Berikan jawaban informatif, ringkas, formal.\n\n"
         "**Panduan Jawaban:**\n"
@@ -309,9 +314,11 @@ def answer_from_documents(question: str, context_chunks: str) -> str:
         "- **Inferensi**: Lakukan inferensi masuk akal didukung teks.\n"
         "- **Tanpa Halusinasi**: JANGAN tambah info di luar konteks.\n"
         "- **Ketidaktersediaan**: Jika tak ada di konteks, jawab: 'Maaf, informasi tidak tersedia dalam dokumen yang diberikan.'\n"
-        "- **Analisis Data**: Jika konteks hasil query (JSON), analisis data (tren, perbandingan, nilai tertinggi/terendah), sajikan insight naratif, bukan data mentah.\n\n"
+        "- **Analisis Data**: Jika konteks hasil query (tabel: baris pertama nama kolom, nilai dipisah '|'), analisis data (tren, perbandingan, nilai tertinggi/terendah), sajikan insight naratif, bukan data mentah. "
+        "Sel bernilai `null` berarti data tidak ada (NULL), sedangkan sel kosong berarti teks kosong. "
+        "Jika ada bagian '[ringkasan seluruh baris]', gunakan ringkasan itu untuk angka agregat karena tabel hanya berisi sampel.\n\n"
         "Contoh (hasil SQL): \n"
-        "Konteks: `[{\"tahun\": 2022, \"jumlah_publikasi\": 150}, {\"tahun\": 2023, \"jumlah_publikasi\": 180}]`\n"
+        "Konteks:\n```\ntahun|jumlah_publikasi\n2022|150\n2023|180\n```\n"
         "Pertanyaan: Bandingkan jumlah publikasi di bidang Teknologi antara tahun 2022 dan 2023\n"
         "Jawaban: Jumlah publikasi di bidang Teknologi meningkat dari 150 (2022) menjadi 180 (2023), naik 30 publikasi atau 20%.\n"
     )
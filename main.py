@@ -7,7 +7,7 @@ from config import BIGQUERY_PROJECT_ID, BIGQUERY_DATASET_ID
 from utils.bigquery_utils import (
     get_actual_tables,
     get_table_schemas,
-    execute_query
+    fetch_query_rows
 )
 from utils.document_utils import (
     find_pdf_url_in_results,
@@ -58,10 +58,10 @@ def unified_workflow(user_input: str):
         return
     
     logger.info("STEP 3: Eksekusi Query...")
-    query_result = execute_query(sql_query)
+    query_rows = fetch_query_rows(sql_query)
 
     # Langkah 4: Periksa hasil query untuk URL dokumen (modifikasi di sini)
-    document_urls = find_pdf_url_in_results(query_result)
+    document_urls = find_pdf_url_in_results(query_rows)
 
     # Langkah 5: Tentukan alur selanjutnya secara dinamis
     if document_urls:
@@ -91,7 +91,7 @@ def unified_workflow(user_input: str):
     else:
         # Alur Metadata (Tampilkan hasil query langsung)
         logger.info("Tidak ada dokumen yang ditemukan. Menampilkan hasil query mentah.")
-        print("\n--- Jawaban Akhir ---\n" + query_result)
+        print("\n--- Jawaban Akhir ---\n" + json.dumps(query_rows, indent=2, default=str))
 
 def main():
     """Fungsi utama untuk menjalankan loop interaktif."""
@@ -0,0 +1,152 @@
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from utils.prompt_utils import (
+    MIN_CELL_CHARS,
+    NULL_MARKER,
+    compact_rows_for_prompt,
+    encode_rows,
+    estimate_tokens,
+    normalize_value,
+    summarize_rows,
+)
+
+
+def _wide_rows(count: int, columns: int) -> list[dict]:
+    return [
+        {f"kol_{c}": f"nilai teks unik baris {r} kolom {c} " + "x" * (10 + (r * c) % 50) for c in range(columns)}
+        for r in range(count)
+    ]
+
+
+def _research_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id_penelitian": 1000 + i,
+            "judul": f"Analisis Data untuk Pembangunan Daerah Tahap {i}",
+            "tahun": 2018 + i % 7,
+            "dana": 1_000_000 * (i + 1),
+            "laporan_akhir": f"https://storage.googleapis.com/upload_data_file/laporan/{1000 + i}.pdf",
+        }
+        for i in range(count)
+    ]
+
+
+# --- normalize_value ---
+
+@pytest.mark.parametrize("value, expected", [
+    (150, "150"),
+    (3.0, "3"),
+    (12.5, "12.5"),
+    (Decimal("1.50"), "1.5"),
+    (0.00001, "1e-05"),
+    (-0.00001, "-1e-05"),
+    (0.123456, "0.1235"),
+    (-0.0, "0"),
+    (1e300, "1e+300"),
+    (Decimal("1E+30"), "1e+30"),
+    (10 ** 400, "1e+400"),
+    (Decimal("NaN"), "NaN"),
+    (Decimal("-Infinity"), "-Infinity"),
+    (True, "true"),
+])
+def test_normalize_value_numbers(value, expected):
+    assert normalize_value(value) == expected
+
+
+def test_normalize_value_dates():
+    assert normalize_value(datetime(2023, 5, 1)) == "2023-05-01"
+    assert normalize_value(datetime(2023, 5, 1, 8, 30, 15, 123)) == "2023-05-01 08:30:15"
+    assert normalize_value(date(2023, 5, 1)) == "2023-05-01"
+
+
+def test_normalize_value_distinguishes_null_from_empty_string():
+    assert normalize_value(None) == NULL_MARKER
+    assert normalize_value("") == ""
+
+
+def test_normalize_value_truncates_and_sanitizes_text():
+    assert normalize_value("a|b\nc  d") == "a/b c d"
+    truncated = normalize_value("x" * 50, max_chars=10)
+    assert len(truncated) == 10
+    assert truncated.endswith("…")
+
+
+# --- encode_rows ---
+
+def test_encode_rows_writes_header_once():
+    rows = [{"tahun": 2022, "jumlah": 150}, {"tahun": 2023, "jumlah": None}, {"tahun": 2024, "jumlah": ""}]
+    assert encode_rows(rows) == f"tahun|jumlah\n2022|150\n2023|{NULL_MARKER}\n2024|"
+
+
+def test_encode_rows_empty():
+    assert encode_rows([]) == "(tidak ada data)"
+
+
+# --- summarize_rows ---
+
+def test_summarize_rows_counts_full_values_not_truncated_prefixes():
+    prefix = "https://storage.googleapis.com/upload_data_file/laporan/"
+    rows = [{"laporan": f"{prefix}{i}.pdf"} for i in range(5)] + [{"laporan": f"{prefix}0.pdf"}]
+    summary = summarize_rows(rows)
+    assert "unik=5" in summary
+    assert "(2)" in summary
+
+
+def test_summarize_rows_skips_top_values_when_all_unique():
+    summary = summarize_rows(_research_rows(20))
+    assert "judul: unik=20\n" in summary
+    assert "laporan_akhir: unik=20" in summary
+    assert "teratas" not in summary
+
+
+def test_summarize_rows_omits_total_for_id_and_year_columns():
+    lines = dict(line.split(": ", 1) for line in summarize_rows(_research_rows(20)).split("\n"))
+    assert lines["id_penelitian"] == "min=1000 maks=1019"
+    assert lines["tahun"] == "min=2018 maks=2024"
+    assert "total=" in lines["dana"]
+
+
+def test_summarize_rows_reports_nulls_and_empty_strings():
+    rows = [{"a": None, "b": ""}, {"a": 1, "b": ""}, {"a": 2, "b": "x"}]
+    lines = summarize_rows(rows).split("\n")
+    assert lines[0].endswith(f"{NULL_MARKER}=1")
+    assert 'teratas=""(2), x(1)' in lines[1]
+
+
+# --- compact_rows_for_prompt ---
+
+def test_compact_rows_keeps_small_result_intact():
+    rows = _research_rows(20)
+    assert compact_rows_for_prompt(rows) == encode_rows(rows)
+
+
+def test_compact_rows_shortens_cells_before_sampling():
+    rows = _wide_rows(20, 10)
+    full_tokens = estimate_tokens(encode_rows(rows))
+    result = compact_rows_for_prompt(rows, token_budget=full_tokens // 2)
+    lines = result.split("\n")
+    assert len(lines) == len(rows) + 1
+    assert "sampel" not in result
+    assert any(line.endswith("…") for line in lines[1:])
+
+
+@pytest.mark.parametrize("budget", [1500, 4000])
+def test_compact_rows_respects_token_budget(budget):
+    result = compact_rows_for_prompt(_wide_rows(300, 40), token_budget=budget)
+    assert estimate_tokens(result) <= budget
+    assert result.startswith("[300 baris, ditampilkan ")
+    assert "[ringkasan seluruh baris]" in result
+
+
+def test_compact_rows_warns_when_budget_cannot_be_met(caplog):
+    with caplog.at_level(logging.WARNING, logger="utils.prompt_utils"):
+        result = compact_rows_for_prompt(_wide_rows(50, 40), token_budget=50)
+    assert estimate_tokens(result) > 50
+    assert "melebihi anggaran 50 token" in caplog.text
+    # Baris sampel dipotong ke panjang sel terpendek yang diizinkan
+    sample_row = result.split("\n")[2]
+    assert all(len(cell) <= MIN_CELL_CHARS for cell in sample_row.split("|"))
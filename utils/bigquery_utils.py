@@ -37,13 +37,16 @@ def get_table_schemas(table_names: list) -> dict:
             logger.error(f"Gagal mengambil skema untuk tabel {table_name}: {e}", exc_info=True)
     return schemas
 
-def execute_query(sql_query: str) -> str:
-    """Mengeksekusi query SQL di BigQuery dan mengembalikan hasil sebagai string JSON."""
-    if not BQ_CLIENT or not sql_query: return "[]"
+def fetch_query_rows(sql_query: str) -> list[dict]:
+    """Mengeksekusi query SQL di BigQuery dan mengembalikan hasil sebagai daftar baris (dict)."""
+    if not BQ_CLIENT or not sql_query: return []
     try:
         query_job = BQ_CLIENT.query(sql_query)
-        results = [dict(row) for row in query_job.result()]
-        return json.dumps(results, indent=2, default=str)
+        return [dict(row) for row in query_job.result()]
     except Exception as e:
         logger.error(f"Gagal mengeksekusi query: {sql_query} - {e}", exc_info=True)
-        return json.dumps([{"error": str(e)}])
\ No newline at end of file
+        return [{"error": str(e)}]
+
+def execute_query(sql_query: str) -> str:
+    """Mengeksekusi query SQL di BigQuery dan mengembalikan hasil sebagai string JSON."""
+    return json.dumps(fetch_query_rows(sql_query), indent=2, default=str)
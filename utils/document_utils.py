@@ -2,7 +2,6 @@ import fitz  # PyMuPDF
 import requests
 import logging
 import re
-import json
 from typing import Optional
 from ocr import ocr_pdf_from_bytes # Impor fungsi OCR yang baru kita buat
 
@@ -11,17 +10,16 @@ logger = logging.getLogger(__name__)
 
 MIN_TEXT_LENGTH_FOR_NON_OCR = 100
 
-def find_pdf_url_in_results(results_json: str) -> list[str]:
-    """Mencari semua URL PDF dalam hasil query JSON."""
+def find_pdf_url_in_results(rows: list[dict]) -> list[str]:
+    """Mencari semua URL PDF dalam baris hasil query."""
     pdf_urls = []
     try:
-        data = json.loads(results_json)
-        for row in data:
+        for row in rows:
             for value in row.values():
                 if isinstance(value, str) and value.lower().endswith('.pdf'):
                     pdf_urls.append(value)
-    except (json.JSONDecodeError, TypeError) as e:
-        logger.warning(f"Gagal mem-parse JSON untuk mencari URL: {e}")
+    except (AttributeError, TypeError) as e:
+        logger.warning(f"Gagal membaca hasil query untuk mencari URL: {e}")
     return pdf_urls # This now returns a list
 
 def extract_text_from_pdf_url(pdf_url: str) -> Optional[str]:
@@ -0,0 +1,284 @@
+import json
+import logging
+import math
+import re
+import sys
+from collections import Counter
+from datetime import date, datetime, time
+from decimal import Decimal
+
+logger = logging.getLogger(__name__)
+
+# Batas panjang sel teks sebelum dipotong (misal abstrak atau judul panjang)
+MAX_CELL_CHARS = 120
+# Anggaran token default untuk hasil query yang dimasukkan ke prompt (lihat juga config.PROMPT_TOKEN_BUDGET)
+PROMPT_TOKEN_BUDGET = 4000
+# Panjang minimal sel teks saat tabel dipersingkat agar muat dalam anggaran token
+MIN_CELL_CHARS = 20
+# Jumlah nilai teratas yang ditampilkan untuk kolom teks pada ringkasan
+SUMMARY_TOP_VALUES = 3
+# Porsi maksimal anggaran token yang boleh dipakai ringkasan; sisanya untuk sampel baris
+SUMMARY_BUDGET_SHARE = 0.5
+# Panjang maksimal nilai teratas yang ditampilkan pada ringkasan
+SUMMARY_VALUE_CHARS = 40
+# Penanda sel NULL agar dapat dibedakan dari string kosong
+NULL_MARKER = "null"
+# Penanda string kosong pada daftar nilai teratas di ringkasan
+EMPTY_TEXT_MARKER = '""'
+# Angka dengan nilai mutlak sebesar ini atau lebih ditulis dalam notasi ilmiah
+LARGE_NUMBER_THRESHOLD = 10 ** 15
+# Perkiraan kasar jumlah karakter per token untuk model Gemini
+CHARS_PER_TOKEN = 4
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Kolom ID, kode, dan tahun: rata-rata dan total nilainya tidak bermakna
+_IDENTIFIER_COLUMN_RE = re.compile(r"(^|_)(id|kode|nomor|no|nim|nip|nidn|tahun|year)($|_)", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Memperkirakan jumlah token sebuah teks tanpa memanggil API."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def to_compact_json(data) -> str:
+    """Serialisasi JSON tanpa spasi dan indentasi untuk dikirim ke LLM."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _format_significant(value) -> str:
+    """Memformat angka dengan 4 digit signifikan, tanpa overflow/underflow float untuk Decimal besar/kecil."""
+    try:
+        number = float(value)
+    except OverflowError:
+        return f"{Decimal(value).normalize():.4g}"
+    if (not math.isfinite(number) or number == 0) and value != 0:
+        return f"{Decimal(value).normalize():.4g}"
+    return f"{number:.4g}"
+
+
+def _format_number(value) -> str:
+    """
+    Menormalkan angka: bilangan bulat tanpa desimal, pecahan maksimal 4 digit,
+    dan 4 digit signifikan untuk nilai kecil (|x| < 1) agar rasio/p-value tidak menjadi 0
+    maupun nilai sangat besar agar tidak ditulis sebagai deret digit panjang.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, Decimal) and not value.is_finite():
+        return str(value)
+    if abs(value) >= LARGE_NUMBER_THRESHOLD:
+        return _format_significant(value)
+    if value == int(value):
+        # int() juga menghilangkan tanda pada -0.0
+        return str(int(value))
+    if abs(value) < 1:
+        return _format_significant(value)
+    return f"{float(value):.4f}".rstrip("0").rstrip(".")
+
+
+def normalize_value(value, max_chars: int = MAX_CELL_CHARS) -> str:
+    """Mengubah satu nilai sel menjadi teks ringkas untuk prompt."""
+    if value is None:
+        return NULL_MARKER
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, Decimal)):
+        return _format_number(value)
+    if isinstance(value, datetime):
+        if value.time() == time(0, 0) and value.tzinfo is None:
+            return value.date().isoformat()
+        return value.replace(microsecond=0).isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        text = to_compact_json(value)
+    else:
+        text = str(value)
+
+    # Baris baru dan pemisah kolom akan merusak format tabel
+    text = _WHITESPACE_RE.sub(" ", text).strip().replace("|", "/")
+    return _truncate(text, max_chars)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Memotong teks yang melebihi `max_chars` dan menandainya dengan '…'."""
+    if len(text) > max_chars:
+        return text[:max_chars - 1].rstrip() + "…"
+    return text
+
+
+def _columns_of(rows: list[dict]) -> list[str]:
+    """Mengumpulkan nama kolom sesuai urutan kemunculan di semua baris."""
+    columns = {}
+    for row in rows:
+        for key in row:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def encode_rows(rows: list[dict], max_chars: int = MAX_CELL_CHARS) -> str:
+    """
+    Mengubah daftar baris menjadi tabel berformat header.
+    Nama kolom hanya ditulis sekali, tiap baris berikutnya berisi nilai yang dipisah '|'.
+    """
+    if not rows:
+        return "(tidak ada data)"
+    columns = _columns_of(rows)
+    return _render_table(columns, _normalized_cells(rows, columns), max_chars)
+
+
+def _normalized_cells(rows: list[dict], columns: list[str]) -> list[list[str]]:
+    """Menormalkan semua sel tanpa pemotongan, agar tabel dapat dirender ulang dengan batas berbeda."""
+    return [[normalize_value(row.get(col), max_chars=sys.maxsize) for col in columns] for row in rows]
+
+
+def _render_table(columns: list[str], cells: list[list[str]], max_chars: int) -> str:
+    """Menyusun tabel berformat header dari sel yang sudah dinormalkan."""
+    lines = ["|".join(columns)]
+    lines.extend("|".join(_truncate(cell, max_chars) for cell in row) for row in cells)
+    return "\n".join(lines)
+
+
+def summarize_rows(rows: list[dict], top_values: int = SUMMARY_TOP_VALUES) -> str:
+    """
+    Membuat ringkasan agregat per kolom (min/maks/rata-rata atau nilai teratas).
+    Kolom ID dan tahun hanya diberi min/maks. Kolom teks yang semua nilainya unik,
+    atau jika `top_values=0`, hanya diberi jumlah nilai unik.
+    """
+    lines = []
+    for col in _columns_of(rows):
+        values = [row.get(col) for row in rows if row.get(col) is not None]
+        nulls = len(rows) - len(values)
+        suffix = f" {NULL_MARKER}={nulls}" if nulls else ""
+
+        if values and all(isinstance(v, (int, float, Decimal)) and not isinstance(v, bool) for v in values):
+            line = f"{col}: min={_format_number(min(values))} maks={_format_number(max(values))}"
+            if not _IDENTIFIER_COLUMN_RE.search(col):
+                total = sum(float(v) for v in values)
+                line += f" rata2={_format_number(total / len(values))} total={_format_number(total)}"
+            lines.append(line + suffix)
+        elif values and all(isinstance(v, (date, datetime)) for v in values):
+            lines.append(
+                f"{col}: dari={normalize_value(min(values))} sampai={normalize_value(max(values))}{suffix}"
+            )
+        else:
+            # Hitung berdasarkan nilai utuh; pemotongan hanya untuk tampilan agar nilai berbeda tidak tergabung
+            counts = Counter(normalize_value(v, max_chars=sys.maxsize) for v in values)
+            most_common = counts.most_common(top_values)
+            # Jika semua nilai unik, daftar teratas hanya berisi nilai acak dengan hitungan 1
+            if most_common and most_common[0][1] == 1:
+                most_common = []
+            top = ", ".join(f"{_truncate(v, SUMMARY_VALUE_CHARS) or EMPTY_TEXT_MARKER}({n})"
+                            for v, n in most_common)
+            top = f" teratas={top}" if top else ""
+            lines.append(f"{col}: unik={len(counts)}{top}{suffix}")
+    return "\n".join(lines)
+
+
+def _sample_indices(total: int, size: int) -> list[int]:
+    """Memilih indeks sampel yang tersebar merata, selalu termasuk baris pertama dan terakhir."""
+    if size >= total:
+        return list(range(total))
+    if size <= 1:
+        return [0]
+    step = (total - 1) / (size - 1)
+    return sorted({round(i * step) for i in range(size)})
+
+
+def _fit_summary(rows: list[dict], token_budget: int) -> str:
+    """
+    Membuat ringkasan yang muat dalam `token_budget`: jumlah nilai teratas dikurangi lebih dulu,
+    lalu kolom terakhir dihilangkan dan dicatat jumlahnya.
+    """
+    for top_values in (SUMMARY_TOP_VALUES, 1, 0):
+        summary = summarize_rows(rows, top_values)
+        if estimate_tokens(summary) <= token_budget:
+            return summary
+
+    lines = summary.split("\n")
+    total = len(lines)
+    while lines:
+        note = f"({total - len(lines)} kolom lain tidak diringkas)"
+        candidate = "\n".join(lines + [note])
+        if estimate_tokens(candidate) <= token_budget:
+            return candidate
+        lines.pop()
+    return f"({total} kolom tidak diringkas)"
+
+
+def _cell_limits(max_chars: int) -> list[int]:
+    """Batas panjang sel yang dicoba berurutan: `max_chars`, lalu separuhnya, hingga `MIN_CELL_CHARS`."""
+    limits = [max_chars]
+    while limits[-1] > MIN_CELL_CHARS:
+        limits.append(max(MIN_CELL_CHARS, limits[-1] // 2))
+    return limits
+
+
+def _compact_rows(rows: list[dict], token_budget: int, max_chars: int) -> tuple[str, int, int]:
+    """
+    Implementasi `compact_rows_for_prompt`.
+    Mengembalikan (teks, jumlah baris yang ditampilkan, batas panjang sel yang dipakai).
+    """
+    if not rows:
+        return encode_rows(rows), 0, max_chars
+
+    columns = _columns_of(rows)
+    cells = _normalized_cells(rows, columns)
+
+    # Langkah 1: pertahankan semua baris dengan memperpendek sel teks panjang
+    for cell_chars in _cell_limits(max_chars):
+        table = _render_table(columns, cells, cell_chars)
+        if estimate_tokens(table) <= token_budget:
+            if cell_chars < max_chars:
+                logger.info(f"Hasil query ({len(rows)} baris) dimuat utuh dengan sel dipotong "
+                            f"menjadi {cell_chars} karakter agar muat dalam {token_budget} token.")
+            return table, len(rows), cell_chars
+
+    # Langkah 2: pemotongan tidak cukup, tampilkan sampel baris beserta ringkasan seluruh baris
+    summary = _fit_summary(rows, int(token_budget * SUMMARY_BUDGET_SHARE))
+    # Cadangan untuk baris penanda "[N baris, ...]" dan "[ringkasan seluruh baris]"
+    markers = f"[{len(rows)} baris, ditampilkan {len(rows)} sampel]\n\n[ringkasan seluruh baris]\n"
+    remaining = token_budget - estimate_tokens(summary) - estimate_tokens(markers)
+
+    header = table.split("\n", 1)[0]
+    avg_row_tokens = max(1, (estimate_tokens(table) - estimate_tokens(header)) // len(rows))
+    size = max(1, (remaining - estimate_tokens(header)) // avg_row_tokens)
+
+    while True:
+        indices = _sample_indices(len(rows), size)
+        sample = _render_table(columns, [cells[i] for i in indices], cell_chars)
+        if estimate_tokens(sample) <= remaining or size <= 1:
+            break
+        size = max(1, min(size - 1, int(size * 0.8)))
+
+    result = (
+        f"[{len(rows)} baris, ditampilkan {len(indices)} sampel]\n{sample}\n"
+        f"[ringkasan seluruh baris]\n{summary}"
+    )
+    result_tokens = estimate_tokens(result)
+    if result_tokens > token_budget:
+        logger.warning(f"Hasil query ({len(rows)} baris) tetap {result_tokens} token setelah diringkas, "
+                       f"melebihi anggaran {token_budget} token.")
+    else:
+        logger.info(f"Hasil query ({len(rows)} baris) melebihi anggaran {token_budget} token, "
+                    f"menampilkan {len(indices)} sampel beserta ringkasan.")
+    return result, len(indices), cell_chars
+
+
+def compact_rows_for_prompt(rows: list[dict], token_budget: int = PROMPT_TOKEN_BUDGET,
+                            max_chars: int = MAX_CELL_CHARS) -> str:
+    """
+    Menyiapkan hasil query untuk prompt LLM.
+    Sel teks panjang diperpendek lebih dulu (hingga `MIN_CELL_CHARS`) agar semua baris tetap tampil.
+    Hanya jika itu tidak cukup, sampel baris ditampilkan bersama ringkasan agregat seluruh baris;
+    ringkasan dibatasi `SUMMARY_BUDGET_SHARE` dari anggaran.
+    """
+    return _compact_rows(rows, token_budget, max_chars)[0]
+
+
+def encode_table_schemas(table_schemas: dict) -> str:
+    """Mengubah skema tabel menjadi satu baris per tabel: `tabel(kolom:TIPE,...)`."""
+    return "\n".join(
+        f"{table}(" + ",".join(f"{field['name']}:{field['type']}" for field in fields) + ")"
+        for table, fields in table_schemas.items()
+    )